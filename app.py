@@ -1,5 +1,9 @@
+import os
+import glob
+import hashlib
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 
 # Configuration
@@ -11,34 +15,174 @@ st.set_page_config(
 
 # Constants
 DATA_CONFIG = {
-    'csv_url': "https://raw.githubusercontent.com/gibsona83/MILVops/main/YTD2025PS.csv",
     'excel_url': "https://raw.githubusercontent.com/gibsona83/MILVops/main/2025_YTD.xlsx",
     'excel_sheet': 'Productivity'
 }
 
+# Rust-backed Excel parser when installed; openpyxl otherwise
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# Columns read from each source file; everything else is skipped at parse time
+COLUMNS_BY_FILE = {
+    'excel': {
+        'Accession': None,
+        'Final Date': None,
+        'Shift Time Final': 'string',
+        'Modality': 'string',
+        'Finalizing Provider': 'string',
+        'RVU': 'float32',
+        'Points': 'float32',
+        'Radiologist Group': 'string'
+    }
+}
+
+# Low-cardinality labels stored as category codes after load
+CATEGORY_COLUMNS = {
+    'excel': ['Finalizing Provider', 'Modality', 'Shift Time Final', 'Radiologist Group']
+}
+
 # Custom styling
 COLOR_SCALE = px.colors.sequential.Blues
 TEMPLATE = 'plotly_white'
 DAY_ORDER = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
 
+def read_with_sidecar(source, reader, **read_kwargs):
+    """Read a data file, preferring a fresh Parquet sidecar for local files"""
+    if not os.path.exists(source):
+        return reader(source, **read_kwargs)
+    
+    # The sidecar name fingerprints the reader settings, so changing them forces a re-parse
+    settings = repr((reader.__name__, sorted(read_kwargs.items())))
+    fingerprint = hashlib.blake2b(settings.encode(), digest_size=8).hexdigest()
+    sidecar = f"{source}.{fingerprint}.parquet"
+    
+    # Reuse the sidecar unless the source file changed since it was written
+    if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(source):
+        return pd.read_parquet(sidecar)
+    
+    df = reader(source, **read_kwargs)
+    try:
+        df.to_parquet(sidecar, index=False)
+    except OSError:
+        return df  # Read-only checkout; Streamlit's in-memory cache still applies
+    
+    # Sidecars written under older reader settings are never read again
+    for stale in glob.glob(f"{glob.escape(source)}.*.parquet"):
+        if stale != sidecar:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return df
+
+def resolve_source(url):
+    """Prefer the copy shipped alongside the app over the GitHub download"""
+    local_path = os.path.basename(url)
+    return local_path if os.path.exists(local_path) else url
+
 @st.cache_data
-def load_data():
-    """Load and process data from GitHub"""
+def load_ytd_data():
+    """Load the year-to-date Productivity sheet"""
+    columns = COLUMNS_BY_FILE['excel']
     try:
-        ps_data = pd.read_csv(DATA_CONFIG['csv_url'], encoding='latin1')
-        ytd_data = pd.read_excel(DATA_CONFIG['excel_url'], sheet_name=DATA_CONFIG['excel_sheet'])
+        ytd_data = read_with_sidecar(
+            resolve_source(DATA_CONFIG['excel_url']),
+            pd.read_excel,
+            sheet_name=DATA_CONFIG['excel_sheet'],
+            engine=EXCEL_ENGINE,
+            usecols=list(columns),
+            dtype={col: dtype for col, dtype in columns.items() if dtype}
+        )
+        
+        # Repeated labels become category codes for cheaper filters and groupbys
+        ytd_data[CATEGORY_COLUMNS['excel']] = ytd_data[CATEGORY_COLUMNS['excel']].astype('category')
         
-        # Convert datetime columns
-        ps_data[['Created', 'Signed']] = ps_data[['Created', 'Signed']].apply(pd.to_datetime, errors='coerce')
-        ytd_data['Final Date'] = pd.to_datetime(ytd_data['Final Date'], errors='coerce')
+        # Convert datetime columns; second resolution is all the source carries
+        ytd_data['Final Date'] = pd.to_datetime(ytd_data['Final Date'], errors='coerce').astype('datetime64[s]')
         
-        # Calculate TAT
-        ps_data['TAT (Minutes)'] = (ps_data['Signed'] - ps_data['Created']).dt.total_seconds() / 60
+        # Date order lets the range filter binary-search instead of comparing every row
+        ytd_data.sort_values('Final Date', kind='stable', inplace=True, ignore_index=True)
         
-        return ps_data, ytd_data
+        # Date bounds for the sidebar, found once here rather than rescanned on every rerun
+        ytd_data.attrs['date_bounds'] = (
+            ytd_data['Final Date'].min().to_pydatetime(),
+            ytd_data['Final Date'].max().to_pydatetime()
+        )
+        
+        return ytd_data
     except Exception as e:
         st.error(f"Data loading error: {str(e)}")
-        return None, None
+        return None
+
+@st.cache_data
+def summarize_selection(date_range, providers, modalities, shifts, groups):
+    """Filter the YTD sheet and build the metrics and chart tables for one selection"""
+    ytd_data = load_ytd_data()
+    
+    # Rows are date-sorted at load, so the range is one contiguous slice
+    lo = ytd_data['Final Date'].searchsorted(pd.to_datetime(date_range[0]), side='left')
+    hi = ytd_data['Final Date'].searchsorted(pd.to_datetime(date_range[1]), side='right')
+    date_slice = ytd_data.iloc[lo:hi]
+    
+    # Apply filters
+    filter_conditions = [
+        (providers, 'Finalizing Provider'),
+        (modalities, 'Modality'),
+        (shifts, 'Shift Time Final'),
+        (groups, 'Radiologist Group')
+    ]
+    
+    # Combine every selection into one mask so the rows are copied only once
+    keep = np.ones(len(date_slice), dtype=bool)
+    for values, column in filter_conditions:
+        if values:
+            keep &= date_slice[column].isin(values).to_numpy()
+    filtered_data = date_slice.take(np.flatnonzero(keep))
+    
+    if filtered_data.empty:
+        return None
+    
+    # Weekly counts: shift dayofweek (Monday=0) onto DAY_ORDER codes (Sunday=0) and bin them
+    day_codes = (filtered_data['Final Date'].dt.dayofweek + 1) % len(DAY_ORDER)
+    day_codes = day_codes.fillna(-1).astype('int8').to_numpy()
+    counted = (day_codes >= 0) & filtered_data['Accession'].notna().to_numpy()
+    weekly_summary = pd.DataFrame({
+        'Day of Week': DAY_ORDER,
+        'Cases': np.bincount(day_codes[counted], minlength=len(DAY_ORDER))
+    })
+    
+    # One pass over the rows per modality/provider pair; both chart tables roll up from it
+    pair_summary = filtered_data.groupby(
+        ['Modality', 'Finalizing Provider'], sort=False, observed=True, dropna=False
+    ).agg(
+        Cases=('Accession', 'count'),
+        Total_RVU=('RVU', 'sum'),
+        RVU_Count=('RVU', 'count')
+    )
+    
+    modality_summary = pair_summary.groupby(
+        level='Modality', sort=False, observed=True
+    )[['Cases', 'Total_RVU']].sum().reset_index()
+    
+    provider_summary = pair_summary.groupby(
+        level='Finalizing Provider', sort=False, observed=True
+    )[['Cases', 'Total_RVU', 'RVU_Count']].sum()
+    provider_summary = provider_summary.assign(
+        Avg_RVU=provider_summary['Total_RVU'] / provider_summary['RVU_Count']
+    )[['Cases', 'Avg_RVU']].reset_index()
+    
+    return {
+        'cases': filtered_data['Accession'].nunique(),
+        'rvu': filtered_data['RVU'].sum(),
+        'points': filtered_data['Points'].sum(),
+        'weekly': weekly_summary,
+        'modality': modality_summary,
+        'provider': provider_summary
+    }
 
 def create_visualization(df, x, y, title, viz_type='bar', sort=True, color=None):
     """Create styled visualization with proper sorting"""
@@ -49,6 +193,9 @@ def create_visualization(df, x, y, title, viz_type='bar', sort=True, color=None)
     # Sort data for bar charts
     if sort and viz_type == 'bar':
         df = df.sort_values(by=y, ascending=False)
+        # Plotly reorders categorical axes by category, so plot plain labels
+        if isinstance(df[x].dtype, pd.CategoricalDtype):
+            df = df.astype({x: str})
     
     # Create chart with error handling
     try:
@@ -105,9 +252,9 @@ def main():
     
     # Load data
     with st.spinner("Loading data..."):
-        ps_data, ytd_data = load_data()
+        ytd_data = load_ytd_data()
     
-    if ps_data is None or ytd_data is None:
+    if ytd_data is None:
         st.warning("⚠️ Data not available. Please check your connection.")
         return
     
@@ -116,69 +263,45 @@ def main():
     with st.sidebar.expander("🔍 Filter Options", expanded=True):
         providers = st.multiselect(
             "Select Providers:", 
-            options=sorted(ytd_data['Finalizing Provider'].dropna().unique())
+            options=ytd_data['Finalizing Provider'].cat.categories.tolist()
         )
         modalities = st.multiselect(
             "Select Modalities:",
-            options=sorted(ytd_data['Modality'].dropna().unique())
+            options=ytd_data['Modality'].cat.categories.tolist()
         )
         shifts = st.multiselect(
             "Select Shifts:",
-            options=sorted(ytd_data['Shift Time Final'].dropna().unique())
+            options=ytd_data['Shift Time Final'].cat.categories.tolist()
         )
         groups = st.multiselect(
             "Select Groups:",
-            options=sorted(ytd_data['Radiologist Group'].dropna().unique())
+            options=ytd_data['Radiologist Group'].cat.categories.tolist()
         )
         
+        min_date, max_date = ytd_data.attrs['date_bounds']
         date_range = st.date_input(
             "Date Range:", 
-            value=(
-                ytd_data['Final Date'].min().to_pydatetime(),
-                ytd_data['Final Date'].max().to_pydatetime()
-            ),
-            min_value=ytd_data['Final Date'].min().to_pydatetime(),
-            max_value=ytd_data['Final Date'].max().to_pydatetime()
+            value=(min_date, max_date),
+            min_value=min_date,
+            max_value=max_date
         )
     
-    # Filter data
-    filtered_data = ytd_data[
-        (ytd_data['Final Date'] >= pd.to_datetime(date_range[0])) &
-        (ytd_data['Final Date'] <= pd.to_datetime(date_range[1]))
-    ].copy()
-    
-    # Apply filters
-    filter_conditions = [
-        (providers, 'Finalizing Provider'),
-        (modalities, 'Modality'),
-        (shifts, 'Shift Time Final'),
-        (groups, 'Radiologist Group')
-    ]
-    
-    for values, column in filter_conditions:
-        if values:
-            filtered_data = filtered_data[filtered_data[column].isin(values)]
+    # Filtering and aggregation are cached per selection; revisiting one skips both
+    summary = summarize_selection(tuple(date_range), providers, modalities, shifts, groups)
     
-    if filtered_data.empty:
+    if summary is None:
         st.warning("No data matching selected filters")
         return
     
-    # Weekly processing
-    filtered_data['Day of Week'] = pd.Categorical(
-        filtered_data['Final Date'].dt.day_name(),
-        categories=DAY_ORDER,
-        ordered=True
-    )
-    
     # Key Metrics
     st.header("📊 Performance Summary")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Cases", f"{filtered_data['Accession'].nunique():,}")
+        st.metric("Total Cases", f"{summary['cases']:,}")
     with col2:
-        st.metric("Total RVUs", f"{filtered_data['RVU'].sum():,.1f}")
+        st.metric("Total RVUs", f"{summary['rvu']:,.1f}")
     with col3:
-        st.metric("Total Points", f"{filtered_data['Points'].sum():,.1f}")
+        st.metric("Total Points", f"{summary['points']:,.1f}")
     
     # Main Visualizations
     with st.container():
@@ -187,12 +310,8 @@ def main():
         
         with col1:
             # Weekly Trends
-            weekly_summary = filtered_data.groupby('Day of Week', observed=False).agg(
-                Cases=('Accession', 'count')
-            ).reset_index()
-            
             fig_weekly = create_visualization(
-                weekly_summary,
+                summary['weekly'],
                 x='Day of Week',
                 y='Cases',
                 title="<b>Weekly Trends</b> (Sunday-Saturday)",
@@ -204,13 +323,8 @@ def main():
         
         with col2:
             # Modality Distribution
-            modality_summary = filtered_data.groupby('Modality').agg(
-                Cases=('Accession', 'count'),
-                Total_RVU=('RVU', 'sum')
-            ).reset_index()
-            
             fig_modality = create_visualization(
-                modality_summary,
+                summary['modality'],
                 x='Modality',
                 y='Cases',
                 color='Total_RVU',
@@ -221,13 +335,8 @@ def main():
     
     # Provider Performance
     with st.expander("🧑⚕️ Detailed Provider Performance", expanded=True):
-        provider_summary = filtered_data.groupby('Finalizing Provider').agg(
-            Cases=('Accession', 'count'),
-            Avg_RVU=('RVU', 'mean')
-        ).reset_index()
-        
         fig_providers = create_visualization(
-            provider_summary,
+            summary['provider'],
             x='Finalizing Provider',
             y='Cases',
             color='Avg_RVU',
@@ -1,5 +1,12 @@
 # ... (keep all imports and constants the same) ...
 
+# ---- Helper Functions ----
+@st.cache_data(show_spinner=False)
+def author_search_index(file_hash, _df, author_col):
+    """Display names keyed by their lowercase form, built once per file."""
+    authors = pd.Series(_df[author_col].cat.categories)
+    return pd.Series(authors.to_numpy(), index=authors.str.lower().to_numpy())
+
 def main():
     # ... (keep sidebar and file upload logic the same) ...
     
@@ -24,8 +31,8 @@ def main():
                 key="prov_date_range"
             )
         with col2:
-            # Provider multi-select with search
-            all_providers = df[display_cols["author"]].unique()
+            # Provider multi-select with search; the categories already list every name once
+            all_providers = df[display_cols["author"]].cat.categories.tolist()
             selected_providers = st.multiselect(
                 "Select Providers:",
                 options=all_providers,
@@ -35,11 +42,8 @@ def main():
         
         # Filter data based on selections
         start_date, end_date = pd.Timestamp(prov_dates[0]), pd.Timestamp(prov_dates[1])
-        prov_filtered = df[
-            (df[display_cols["date"] >= start_date) &
-            (df[display_cols["date"] <= end_date) &
-            (df[display_cols["author"]].isin(selected_providers))
-        ]
+        prov_filtered = date_slice(df, display_cols["date"], start_date, end_date)
+        prov_filtered = prov_filtered[prov_filtered[display_cols["author"]].isin(selected_providers)]
         
         if prov_filtered.empty:
             return st.warning("⚠️ No data for selected filters")
@@ -54,38 +58,49 @@ def main():
         with col3:
             st.metric("Average Procedures/HD", round(prov_filtered[display_cols["procedure/half"]].mean(), 1))
         
+        # One cached groupby feeds both charts
+        prov_summary = provider_aggregates(
+            file_hash,
+            prov_filtered,
+            display_cols["author"],
+            display_cols["points/half day"],
+            display_cols["procedure/half"],
+            start_date,
+            end_date,
+            tuple(selected_providers),
+        )
+
         # Visualizations in columns
         st.markdown("### 📈 Performance Breakdown")
         c1, c2 = st.columns(2)
         with c1:
-            st.plotly_chart(px.bar(
-                prov_filtered.groupby(display_cols["author"])[display_cols["points/half day"]].mean()
-                .reset_index().sort_values(display_cols["points/half day"], ascending=False),
-                x=display_cols["points/half day"],
-                y=display_cols["author"],
-                orientation='h',
-                color=display_cols["points/half day"],
-                color_continuous_scale='Viridis',
-                title="Average Points per Half-Day"
-            ), use_container_width=True)
+            st.plotly_chart(provider_bar(
+                "prov_points_fig",
+                prov_summary,
+                display_cols["author"],
+                display_cols["points/half day"],
+                "Average Points per Half-Day"
+            ), use_container_width=True, key="prov_points")
         with c2:
-            st.plotly_chart(px.bar(
-                prov_filtered.groupby(display_cols["author"])[display_cols["procedure/half"]].mean()
-                .reset_index().sort_values(display_cols["procedure/half"], ascending=False),
-                x=display_cols["procedure/half"],
-                y=display_cols["author"],
-                orientation='h',
-                color=display_cols["procedure/half"],
-                color_continuous_scale='Viridis',
-                title="Average Procedures per Half-Day"
-            ), use_container_width=True)
+            st.plotly_chart(provider_bar(
+                "prov_procedures_fig",
+                prov_summary,
+                display_cols["author"],
+                display_cols["procedure/half"],
+                "Average Procedures per Half-Day"
+            ), use_container_width=True, key="prov_procedures")
         
         # Detailed data with search
         st.markdown("### 🔍 Detailed Provider Data")
         prov_search = st.text_input("Search within results:", key="prov_search")
-        final_data = prov_filtered[prov_filtered[display_cols["author"]].str.contains(
-            prov_search, case=False)] if prov_search else prov_filtered
-        st.dataframe(final_data, use_container_width=True)
+        if prov_search:
+            # Match against the few distinct names, then select their rows
+            search_index = author_search_index(file_hash, df, display_cols["author"])
+            matches = search_index[search_index.index.str.contains(prov_search.lower(), regex=False)]
+            final_data = prov_filtered[prov_filtered[display_cols["author"]].isin(matches.to_numpy())]
+        else:
+            final_data = prov_filtered
+        show_table(final_data)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,23 +1,41 @@
 import streamlit as st
 import pandas as pd
 import os
-import plotly.express as px
+import io
+import hashlib
+import numpy as np
+import plotly.graph_objects as go
 
 # ---- Page Configuration ----
 st.set_page_config(page_title="MILV Daily Productivity", layout="wide")
 
 # ---- Constants ----
-FILE_STORAGE_PATH = "latest_rvu.xlsx"
+FILE_STORAGE_PATH = "latest_rvu.parquet"
+# Workbook stored by earlier versions; converted to FILE_STORAGE_PATH on first run
+LEGACY_STORAGE_PATH = "latest_rvu.xlsx"
 REQUIRED_COLUMNS = {"date", "author", "procedure", "points", "shift", 
                     "points/half day", "procedure/half"}
 COLOR_SCALE = "Viridis"
+# Rust-backed Excel parser when installed; openpyxl otherwise
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+# Detail tables render at most this many rows; the charts still use every row
+MAX_TABLE_ROWS = 1000
+# Longer trend traces are thinned to this many points (LTTB) before they are sent to the browser
+TREND_MAX_POINTS = 2000
 
 # ---- Helper Functions ----
-@st.cache_data(show_spinner=False)
-def load_data(file_path):
-    """Load and preprocess data from an Excel file."""
+def file_digest(data):
+    """Short content hash used to key cached work on a data file."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def clean_upload(source):
+    """Parse, validate and preprocess an uploaded Excel workbook."""
     try:
-        xls = pd.ExcelFile(file_path)
+        xls = pd.ExcelFile(source, engine=EXCEL_ENGINE)
         df = xls.parse(xls.sheet_names[0])
 
         # Clean column names (case-insensitive)
@@ -35,42 +53,170 @@ def load_data(file_path):
 
         # Process date column
         date_col = col_map["date"]
-        df[date_col] = pd.to_datetime(df[date_col], errors="coerce").dt.normalize()
+        if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+            df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+        df[date_col] = df[date_col].dt.normalize()
         df.dropna(subset=[date_col], inplace=True)
+        df.sort_values(date_col, kind="stable", inplace=True, ignore_index=True)
 
-        # Convert numeric columns
+        # Convert numeric columns; ones Excel already typed only need their gaps filled.
+        # float32 halves the memory the groupbys and filters stream through
         numeric_cols = [col_map[col] for col in REQUIRED_COLUMNS if col not in ["date", "author"]]
-        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce").fillna(0)
+        untyped_cols = [col for col in numeric_cols if not pd.api.types.is_numeric_dtype(df[col])]
+        df[untyped_cols] = df[untyped_cols].apply(pd.to_numeric, errors="coerce")
+        df[numeric_cols] = df[numeric_cols].fillna(0).astype("float32")
 
-        # Format author names
+        # Format author names; a few dozen providers repeat across every row
         author_col = col_map["author"]
-        df[author_col] = df[author_col].astype(str).str.strip().str.title()
+        df[author_col] = df[author_col].astype(str).str.strip().str.title().astype("category")
+
+        # Mixed-type columns (e.g. Turnaround) become text so Arrow can store them
+        object_cols = df.select_dtypes(include="object").columns
+        df[object_cols] = df[object_cols].astype("string")
 
         return df
     except Exception as e:
         st.error(f"🚨 Error processing file: {str(e)}")
         return None
 
+@st.cache_data(show_spinner=False, max_entries=1)
+def load_data(_source, file_hash):
+    """Read the stored, already-cleaned RVU data (cached per file content)."""
+    try:
+        return pd.read_parquet(_source)
+    except Exception as e:
+        st.error(f"🚨 Error processing file: {str(e)}")
+        return None
+
+@st.cache_data(show_spinner=False)
+def provider_aggregates(file_hash, _prov_filtered, author_col, points_col, procedure_col,
+                        start_date, end_date, providers):
+    """Per-provider half-day averages, cached on the file hash and filter inputs."""
+    return _prov_filtered.groupby(author_col, sort=False, observed=True).agg({
+        points_col: "mean",
+        procedure_col: "mean",
+    }).reset_index()
+
+def date_slice(df, date_col, start, end):
+    """Rows dated start through end; the stored data is sorted by date, so this is a binary search."""
+    lo = df[date_col].searchsorted(start, side="left")
+    hi = df[date_col].searchsorted(end, side="right")
+    return df.iloc[lo:hi]
+
+def provider_bar(key, summary, author_col, metric_col, title):
+    """Horizontal bar of one per-provider metric; later reruns only swap its arrays."""
+    fig = st.session_state.get(key)
+    # Rebuild when any label changes, e.g. a later upload spells a header differently
+    labels = (title, author_col, metric_col)
+    if fig is None or (fig.layout.title.text, fig.layout.yaxis.title.text, fig.layout.xaxis.title.text) != labels:
+        fig = go.Figure(
+            data=[go.Bar(
+                orientation="h",
+                texttemplate="%{x:.6~g}",  # trims float32 noise from the labels
+                marker=dict(colorscale=COLOR_SCALE, showscale=True, colorbar=dict(title=metric_col)),
+            )],
+            layout=dict(title=title, xaxis_title=metric_col, yaxis_title=author_col, barmode="relative"),
+        )
+        st.session_state[key] = fig
+
+    ranked = summary.sort_values(metric_col, ascending=False)
+    values = ranked[metric_col].to_numpy()
+    with fig.batch_update():
+        fig.data[0].x = values
+        fig.data[0].y = ranked[author_col].to_numpy()
+        fig.data[0].marker.color = values
+    return fig
+
+def lttb_indices(x, y, n_out):
+    """Positions kept by Largest-Triangle-Three-Buckets downsampling of (x, y) to n_out points."""
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    # First and last points stay; each bucket between them keeps the point forming
+    # the largest triangle with the previous pick and the next bucket's average
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(area.argmax())
+        keep[i + 1] = prev
+    return keep
+
+def trend_figure(key, x, x_title, series, title):
+    """Build a WebGL line figure once per session and refresh its traces in place."""
+    fig = st.session_state.get(key)
+    if (fig is None or [trace.name for trace in fig.data] != list(series)
+            or fig.layout.xaxis.title.text != x_title):
+        fig = go.Figure(
+            data=[go.Scattergl(mode="lines+markers", name=name) for name in series],
+            layout=dict(title=title, xaxis_title=x_title, yaxis_title="value", legend_title_text="variable"),
+        )
+        st.session_state[key] = fig
+
+    x_num = x.astype("datetime64[s]").astype(np.int64).astype(np.float64)
+    with fig.batch_update():
+        for trace, values in zip(fig.data, series.values()):
+            keep = lttb_indices(x_num, values.astype(np.float64), TREND_MAX_POINTS)
+            trace.x = x[keep]
+            trace.y = values[keep]
+    return fig
+
+def show_table(df):
+    """Render the first MAX_TABLE_ROWS rows, noting when the table is cut short."""
+    if len(df) > MAX_TABLE_ROWS:
+        st.caption(f"Showing the first {MAX_TABLE_ROWS:,} of {len(df):,} rows")
+    st.dataframe(df.head(MAX_TABLE_ROWS), use_container_width=True)
+
 # ---- Main Application ----
 def main():
     st.sidebar.image("milv.png", width=250)
     uploaded_file = st.sidebar.file_uploader("📤 Upload RVU File", type=["xlsx"])
 
     if uploaded_file:
-        try:
-            pd.read_excel(uploaded_file).to_excel(FILE_STORAGE_PATH, index=False)
-            st.success("✅ File uploaded successfully!")
-        except Exception as e:
-            st.error(f"❌ Upload failed: {str(e)}")
+        # The uploader returns the same file on every rerun; only persist new content
+        upload_bytes = uploaded_file.getvalue()
+        upload_hash = file_digest(upload_bytes)
+        if st.session_state.get("upload_hash") != upload_hash:
+            # Store the cleaned frame as Parquet so later runs never re-parse the workbook
+            uploaded_df = clean_upload(io.BytesIO(upload_bytes))
+            if uploaded_df is not None:
+                try:
+                    uploaded_df.to_parquet(FILE_STORAGE_PATH, compression="zstd", index=False)
+                    st.session_state["upload_hash"] = upload_hash
+                    st.success("✅ File uploaded successfully!")
+                except Exception as e:
+                    st.error(f"❌ Upload failed: {str(e)}")
+
+    if not os.path.exists(FILE_STORAGE_PATH) and os.path.exists(LEGACY_STORAGE_PATH):
+        # Keep the workbook an older version stored, cleaning it into Parquet once
+        legacy_df = clean_upload(LEGACY_STORAGE_PATH)
+        if legacy_df is not None:
+            try:
+                legacy_df.to_parquet(FILE_STORAGE_PATH, compression="zstd", index=False)
+            except Exception as e:
+                st.error(f"❌ Conversion failed: {str(e)}")
+
+    if not os.path.exists(FILE_STORAGE_PATH):
+        return st.info("ℹ️ Please upload a file")
 
-    df = load_data(FILE_STORAGE_PATH) if os.path.exists(FILE_STORAGE_PATH) else None
+    with open(FILE_STORAGE_PATH, "rb") as f:
+        file_hash = file_digest(f.read())
+    df = load_data(FILE_STORAGE_PATH, file_hash)
     if df is None:
         return st.info("ℹ️ Please upload a file")
 
     col_map = {col.lower(): col for col in df.columns}
     display_cols = {k: col_map[k] for k in REQUIRED_COLUMNS}
 
-    min_date, max_date = df[display_cols["date"]].min().date(), df[display_cols["date"]].max().date()
+    # clean_upload sorts by date and drops missing ones, so the bounds are the end rows
+    min_date = df[display_cols["date"]].iloc[0].date()
+    max_date = df[display_cols["date"]].iloc[-1].date()
 
     st.title("📊 MILV Daily Productivity")
     tab1, tab2 = st.tabs(["📅 Daily View", "📈 Trend Analysis"])
@@ -78,7 +224,7 @@ def main():
     # ---- Daily View ----
     with tab1:
         st.subheader(f"📅 Data for {max_date.strftime('%b %d, %Y')}")
-        df_latest = df[df[display_cols["date"]] == pd.Timestamp(max_date)]
+        df_latest = date_slice(df, display_cols["date"], pd.Timestamp(max_date), pd.Timestamp(max_date))
 
         if not df_latest.empty:
             # Multi-select searchable dropdown for filtering
@@ -96,36 +242,24 @@ def main():
             # Bar charts sorted high to low
             col1, col2 = st.columns(2)
             with col1:
-                st.plotly_chart(
-                    px.bar(
-                        filtered_latest.sort_values(display_cols["points/half day"], ascending=False),
-                        x=display_cols["points/half day"],
-                        y=display_cols["author"],
-                        orientation="h",
-                        text=display_cols["points/half day"],
-                        color=display_cols["points/half day"],
-                        color_continuous_scale=COLOR_SCALE,
-                        title="🏆 Points per Half-Day",
-                    ),
-                    use_container_width=True,
-                )
+                st.plotly_chart(provider_bar(
+                    "daily_points_fig",
+                    filtered_latest,
+                    display_cols["author"],
+                    display_cols["points/half day"],
+                    "🏆 Points per Half-Day"
+                ), use_container_width=True, key="daily_points")
             with col2:
-                st.plotly_chart(
-                    px.bar(
-                        filtered_latest.sort_values(display_cols["procedure/half"], ascending=False),
-                        x=display_cols["procedure/half"],
-                        y=display_cols["author"],
-                        orientation="h",
-                        text=display_cols["procedure/half"],
-                        color=display_cols["procedure/half"],
-                        color_continuous_scale=COLOR_SCALE,
-                        title="⚡ Procedures per Half-Day",
-                    ),
-                    use_container_width=True,
-                )
+                st.plotly_chart(provider_bar(
+                    "daily_procedures_fig",
+                    filtered_latest,
+                    display_cols["author"],
+                    display_cols["procedure/half"],
+                    "⚡ Procedures per Half-Day"
+                ), use_container_width=True, key="daily_procedures")
 
             st.subheader("📋 Detailed Data")
-            st.dataframe(filtered_latest, use_container_width=True)
+            show_table(filtered_latest)
 
     # ---- Trend Analysis ----
     with tab2:
@@ -142,7 +276,7 @@ def main():
             st.error("❌ Invalid date range")
             return
 
-        df_range = df[df[display_cols["date"]].between(pd.Timestamp(dates[0]), pd.Timestamp(dates[1]))]
+        df_range = date_slice(df, display_cols["date"], pd.Timestamp(dates[0]), pd.Timestamp(dates[1]))
 
         if df_range.empty:
             st.warning("⚠️ No data available for the selected range")
@@ -161,54 +295,51 @@ def main():
         df_filtered_trend = df_range[df_range[display_cols["author"]].isin(selected_providers_trend)] if selected_providers_trend else df_range
 
         st.subheader("📊 Provider Performance Over Time")
-        fig = px.line(
-            df_filtered_trend,
-            x=display_cols["date"],
-            y=[display_cols["points/half day"], display_cols["procedure/half"]],
-            title="📈 Performance Trends",
-            markers=True,
+        fig = trend_figure(
+            "trend_fig",
+            df_filtered_trend[display_cols["date"]].to_numpy(),
+            display_cols["date"],
+            {
+                col: df_filtered_trend[col].to_numpy()
+                for col in (display_cols["points/half day"], display_cols["procedure/half"])
+            },
+            "📈 Performance Trends",
         )
         st.plotly_chart(fig, use_container_width=True)
 
-        # Aggregate provider performance
-        provider_summary = df_filtered_trend.groupby(display_cols["author"]).agg({
-            display_cols["points/half day"]: "mean",
-            display_cols["procedure/half"]: "mean",
-        }).reset_index()
+        # Aggregate provider performance; unchanged filters reuse the cached result
+        provider_summary = provider_aggregates(
+            file_hash,
+            df_filtered_trend,
+            display_cols["author"],
+            display_cols["points/half day"],
+            display_cols["procedure/half"],
+            pd.Timestamp(dates[0]),
+            pd.Timestamp(dates[1]),
+            tuple(selected_providers_trend),
+        )
 
         # Sorted bar charts
         col1, col2 = st.columns(2)
         with col1:
-            st.plotly_chart(
-                px.bar(
-                    provider_summary.sort_values(display_cols["points/half day"], ascending=False),
-                    x=display_cols["points/half day"],
-                    y=display_cols["author"],
-                    orientation="h",
-                    text=display_cols["points/half day"],
-                    color=display_cols["points/half day"],
-                    color_continuous_scale=COLOR_SCALE,
-                    title="🏆 Avg Points per Half-Day",
-                ),
-                use_container_width=True,
-            )
+            st.plotly_chart(provider_bar(
+                "trend_points_fig",
+                provider_summary,
+                display_cols["author"],
+                display_cols["points/half day"],
+                "🏆 Avg Points per Half-Day"
+            ), use_container_width=True, key="trend_points")
         with col2:
-            st.plotly_chart(
-                px.bar(
-                    provider_summary.sort_values(display_cols["procedure/half"], ascending=False),
-                    x=display_cols["procedure/half"],
-                    y=display_cols["author"],
-                    orientation="h",
-                    text=display_cols["procedure/half"],
-                    color=display_cols["procedure/half"],
-                    color_continuous_scale=COLOR_SCALE,
-                    title="⚡ Avg Procedures per Half-Day",
-                ),
-                use_container_width=True,
-            )
+            st.plotly_chart(provider_bar(
+                "trend_procedures_fig",
+                provider_summary,
+                display_cols["author"],
+                display_cols["procedure/half"],
+                "⚡ Avg Procedures per Half-Day"
+            ), use_container_width=True, key="trend_procedures")
 
         st.subheader("📋 Detailed Data")
-        st.dataframe(df_filtered_trend, use_container_width=True)
+        show_table(df_filtered_trend)
 
 if __name__ == "__main__":
     main()